@@ -0,0 +1,309 @@
+"""
+Synthetic-corpus benchmark for every pipeline stage.
+
+    python -m bench.run_bench --docs 2000 --words 800 --out bench.json
+    python -m bench.run_bench --baseline bench.json          # compare against an earlier commit
+
+Each stage runs in its own subprocess so peak RSS (ru_maxrss) is per stage.
+ru_maxrss also covers the stage's fixtures, so stage_rss_kb (peak minus the
+high-water mark after setup) is the number to compare for memory regressions.
+Results go to stdout (or --out) as JSON; progress lines go to stderr.
+"""
+from __future__ import annotations
+from contextlib import ExitStack, redirect_stdout
+from dataclasses import asdict
+from pathlib import Path
+import argparse, asyncio, importlib, io, os, platform, random, resource
+import shutil, subprocess, sys, tempfile, time, tracemalloc
+
+import orjson
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from bench.synth_corpus import (
+    SynthConfig, SynthServer, iter_docs, load_frames, make_html, make_sequences,
+    write_features, write_raw_corpus,
+)
+
+COLLECT_DOCS = 200  # stand-in server pages fetched by collect_01
+
+def peak_rss_kb() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes on Linux
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+def count_lines(root: Path) -> int:
+    return sum(fp.read_bytes().count(b"\n") for fp in root.glob("*/*.jsonl"))
+
+# ---- Stages: each returns a zero-arg callable that does the timed work and returns docs processed
+
+def stage_extract_visible_text(cfg, frames, stack):
+    from src.text_utils import extract_visible_text
+    rng = random.Random(cfg.seed + 3)
+    pages = [make_html(rng, f"Story {i}", d["text"]) for i, d in enumerate(iter_docs(cfg, frames))]
+    def work():
+        for html in pages:
+            extract_visible_text(html)
+        return len(pages)
+    return work
+
+def stage_frame_score(cfg, frames, stack):
+    from src.frame_model import FrameModel
+    model = FrameModel(frame_lexicon=frames)
+    texts = [d["text"] for d in iter_docs(cfg, frames)]
+    def work():
+        for t in texts:
+            model.score(t)
+        return len(texts)
+    return work
+
+def stage_state_sequence(cfg, frames, stack):
+    from src.frame_model import FrameModel
+    model = FrameModel(frame_lexicon=frames)
+    texts = [d["text"] for d in iter_docs(cfg, frames)]
+    def work():
+        for t in texts:
+            model.to_state_sequence(t)
+        return len(texts)
+    return work
+
+def stage_state_sequence_sweep(cfg, frames, stack):
+    from src.frame_model import FrameModel, overlay_lexicon
+    # one drop-one-frame variant per frame, all scored in the same pass as the base lexicon
+    variants = {f"drop_{k}": overlay_lexicon(frames, {k: None}) for k in frames}
+    model = FrameModel(frame_lexicon=frames, variants=variants)
+    texts = [d["text"] for d in iter_docs(cfg, frames)]
+    def work():
+        for t in texts:
+            model.to_state_sequences(t)
+        return len(texts)
+    return work
+
+def stage_dedupe_02(cfg, frames, stack):
+    mod = importlib.import_module("scripts.02_clean_dedupe")
+    n = count_lines(Path("data/raw"))
+    def work():
+        mod.run()
+        return n
+    return work
+
+def stage_build_markov(cfg, frames, stack):
+    from src.markov import build_markov
+    states = list(frames.keys())
+    seqs = make_sequences(cfg, states)
+    def work():
+        build_markov(seqs, states)
+        return len(seqs)
+    return work
+
+def stage_markov_report_04_05(cfg, frames, stack):
+    m04 = importlib.import_module("scripts.04_build_markov")
+    m05 = importlib.import_module("scripts.05_report")
+    n = count_lines(Path("data/features"))
+    def work():
+        m04.run()
+        m05.run()
+        return n
+    return work
+
+def stage_collect_01(cfg, frames, stack):
+    from src.http_client import HttpClient, FetchConfig
+    collect = importlib.import_module("scripts.01_collect")
+    scfg = SynthConfig(**{**asdict(cfg), "n_docs": min(cfg.n_docs, COLLECT_DOCS)})
+    server = stack.enter_context(SynthServer(scfg, frames))
+
+    async def _collect():
+        # the stand-in server is local, so lift the politeness limit
+        client = HttpClient(FetchConfig(rps=1000.0))
+        try:
+            raw = await collect.fetch_rss(server.feed_url)
+            links = collect.parse_rss_links(raw, limit=len(server.pages))
+            pages = await collect.fetch_pages(client, links, limit=len(links))
+        finally:
+            await client.aclose()
+        errors = [p["error"] for p in pages if "error" in p]
+        if errors:
+            # a broken client/server must not show up as full throughput
+            raise RuntimeError(f"{len(errors)}/{len(pages)} fetches failed, first: {errors[0]}")
+        return len(pages)
+
+    return lambda: asyncio.run(_collect())
+
+STAGES = {
+    "collect_01": stage_collect_01,
+    "extract_visible_text": stage_extract_visible_text,
+    "frame_score": stage_frame_score,
+    "state_sequence": stage_state_sequence,
+    "state_sequence_sweep": stage_state_sequence_sweep,
+    "dedupe_02": stage_dedupe_02,
+    "build_markov": stage_build_markov,
+    "markov_report_04_05": stage_markov_report_04_05,
+}
+
+def synth_config(args) -> SynthConfig:
+    return SynthConfig(
+        n_docs=args.docs,
+        doc_words=args.words,
+        word_jitter=args.jitter,
+        keyword_rate=args.keyword_rate,
+        dup_rate=args.dup_rate,
+        short_rate=args.short_rate,
+        n_actors=args.actors,
+        seed=args.seed,
+    )
+
+def run_stage(name: str, args) -> dict:
+    cfg = synth_config(args)
+    workdir = Path(args.workdir)
+    frames = load_frames(workdir / "config" / "frames.yaml")
+    os.chdir(workdir)  # stage scripts use repo-relative paths
+
+    with ExitStack() as stack:
+        work = STAGES[name](cfg, frames, stack)
+        rss_setup = peak_rss_kb()
+
+        times, n = [], 0
+        for _ in range(args.repeat):
+            with redirect_stdout(io.StringIO()):
+                t0 = time.perf_counter()
+                n = work()
+                times.append(time.perf_counter() - t0)
+        rss_peak = peak_rss_kb()
+
+        traced_peak = None
+        if not args.no_tracemalloc:
+            tracemalloc.start()
+            with redirect_stdout(io.StringIO()):
+                work()
+            traced_peak = tracemalloc.get_traced_memory()[1] // 1024
+            tracemalloc.stop()
+
+    best = min(times)
+    return {
+        "docs": n,
+        "seconds": best,
+        "seconds_all": times,
+        "docs_per_sec": n / best if best > 0 else None,
+        "rss_setup_kb": rss_setup,
+        "peak_rss_kb": rss_peak,
+        "stage_rss_kb": rss_peak - rss_setup,
+        "traced_peak_kb": traced_peak,
+    }
+
+def git_info() -> dict:
+    def _git(*a):
+        r = subprocess.run(["git", *a], cwd=ROOT, capture_output=True, text=True)
+        return r.stdout.strip() if r.returncode == 0 else None
+    return {"commit": _git("rev-parse", "HEAD"), "dirty": bool(_git("status", "--porcelain", "--untracked-files=no"))}
+
+def compare(cur: dict, base: dict) -> dict:
+    out = {}
+    for name, s in cur["stages"].items():
+        b = base.get("stages", {}).get(name)
+        if not b or "error" in s or "error" in b:
+            continue
+        out[name] = {
+            "docs_per_sec_ratio": (s["docs_per_sec"] / b["docs_per_sec"]) if s["docs_per_sec"] and b["docs_per_sec"] else None,
+            "peak_rss_ratio": s["peak_rss_kb"] / b["peak_rss_kb"] if b["peak_rss_kb"] else None,
+            "stage_rss_ratio": s["stage_rss_kb"] / b["stage_rss_kb"] if b.get("stage_rss_kb") else None,
+            "stage_rss_kb_diff": s["stage_rss_kb"] - b["stage_rss_kb"] if "stage_rss_kb" in b else None,
+        }
+    return {"commit": base.get("commit"), "stages": out}
+
+def child_argv(args, stage: str, workdir: Path) -> list[str]:
+    argv = [
+        sys.executable, "-m", "bench.run_bench",
+        "--stage", stage, "--workdir", str(workdir),
+        "--docs", str(args.docs), "--words", str(args.words),
+        "--jitter", str(args.jitter), "--keyword-rate", str(args.keyword_rate),
+        "--dup-rate", str(args.dup_rate), "--short-rate", str(args.short_rate),
+        "--actors", str(args.actors), "--seed", str(args.seed),
+        "--repeat", str(args.repeat),
+    ]
+    if args.no_tracemalloc:
+        argv.append("--no-tracemalloc")
+    return argv
+
+def run_all(args) -> dict:
+    cfg = synth_config(args)
+    stages = args.stages.split(",") if args.stages else list(STAGES)
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        raise SystemExit(f"[ERR] unknown stages: {unknown} (choose from {list(STAGES)})")
+
+    workdir = Path(tempfile.mkdtemp(prefix="polar_bench_"))
+    try:
+        (workdir / "config").mkdir()
+        shutil.copy2(args.frames, workdir / "config" / "frames.yaml")
+        frames = load_frames(args.frames)
+        n_raw = write_raw_corpus(workdir, cfg, frames)
+        n_feat = write_features(workdir, cfg, list(frames.keys()))
+        print(f"[OK] synthetic corpus: raw_rows={n_raw} feature_rows={n_feat} -> {workdir}", file=sys.stderr)
+
+        env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+        results = {}
+        for stage in stages:
+            r = subprocess.run(child_argv(args, stage, workdir), cwd=ROOT, env=env, capture_output=True, text=True)
+            if r.returncode != 0:
+                results[stage] = {"error": r.stderr.strip().splitlines()[-1] if r.stderr.strip() else f"exit {r.returncode}"}
+                print(f"[WARN] {stage}: {results[stage]['error']}", file=sys.stderr)
+                continue
+            results[stage] = orjson.loads(r.stdout.strip().splitlines()[-1])
+            s = results[stage]
+            print(f"[OK] {stage}: docs={s['docs']} docs/s={s['docs_per_sec']:.1f} peak_rss_kb={s['peak_rss_kb']} stage_rss_kb={s['stage_rss_kb']}", file=sys.stderr)
+    finally:
+        if args.keep_workdir:
+            print(f"[OK] kept {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        **git_info(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {**asdict(cfg), "repeat": args.repeat, "collect_docs": min(cfg.n_docs, COLLECT_DOCS)},
+        "stages": results,
+    }
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Synthetic-corpus benchmark for the polar_markov pipeline")
+    ap.add_argument("--docs", type=int, default=1000)
+    ap.add_argument("--words", type=int, default=800, help="mean words per document")
+    ap.add_argument("--jitter", type=float, default=0.25, help="relative spread of document length")
+    ap.add_argument("--keyword-rate", type=float, default=0.08)
+    ap.add_argument("--dup-rate", type=float, default=0.05)
+    ap.add_argument("--short-rate", type=float, default=0.05)
+    ap.add_argument("--actors", type=int, default=4, help="actors per pole")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per stage (best is reported)")
+    ap.add_argument("--no-tracemalloc", action="store_true")
+    ap.add_argument("--stages", default="", help=f"comma-separated subset of {','.join(STAGES)}")
+    ap.add_argument("--frames", default=str(ROOT / "config" / "frames.yaml"))
+    ap.add_argument("--out", default="", help="write JSON here instead of stdout")
+    ap.add_argument("--baseline", default="", help="earlier JSON output to compare against")
+    ap.add_argument("--keep-workdir", action="store_true")
+    ap.add_argument("--stage", default="", help=argparse.SUPPRESS)
+    ap.add_argument("--workdir", default="", help=argparse.SUPPRESS)
+    return ap.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.stage:
+        sys.stdout.write(orjson.dumps(run_stage(args.stage, args)).decode() + "\n")
+        return
+
+    report = run_all(args)
+    if args.baseline:
+        report["vs_baseline"] = compare(report, orjson.loads(Path(args.baseline).read_bytes()))
+
+    data = orjson.dumps(report, option=orjson.OPT_INDENT_2)
+    if args.out:
+        Path(args.out).write_bytes(data)
+        print(f"[OK] wrote {args.out}", file=sys.stderr)
+    else:
+        sys.stdout.write(data.decode() + "\n")
+
+if __name__ == "__main__":
+    main()
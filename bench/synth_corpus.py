@@ -0,0 +1,228 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List
+from xml.sax.saxutils import escape
+import random
+import threading
+
+import yaml, orjson
+
+POLES = ["conservative", "liberal"]
+
+FILLER = (
+    "the of and to in that is for on with as was by it at from this be are "
+    "have has an not but or which their more said its about they were after "
+    "over who also than into would could other new people year week state "
+    "government president report public plan group policy officials house "
+    "senate campaign city country leaders support during while under against "
+    "between before since many most some several statement local national "
+    "according told interview program issue question office members week"
+).split()
+
+@dataclass
+class SynthConfig:
+    n_docs: int = 1000
+    doc_words: int = 800
+    word_jitter: float = 0.25
+    keyword_rate: float = 0.08
+    dup_rate: float = 0.05
+    short_rate: float = 0.05
+    n_actors: int = 4
+    seed: int = 0
+
+def load_frames(p: str|Path) -> Dict[str, List[str]]:
+    return (yaml.safe_load(Path(p).read_text(encoding="utf-8")) or {})["frames"]
+
+def doc_length(rng: random.Random, cfg: SynthConfig) -> int:
+    lo = max(1, int(cfg.doc_words * (1 - cfg.word_jitter)))
+    hi = max(lo, int(cfg.doc_words * (1 + cfg.word_jitter)))
+    return rng.randint(lo, hi)
+
+def make_text(rng: random.Random, frames: Dict[str, List[str]], n_words: int, keyword_rate: float) -> str:
+    # each doc leans on a couple of frames so windows have a clear winner
+    keys = list(frames.keys())
+    focus = rng.sample(keys, k=min(3, len(keys)))
+    words: List[str] = []
+    while len(words) < n_words:
+        if rng.random() < keyword_rate:
+            frame = rng.choice(focus) if rng.random() < 0.7 else rng.choice(keys)
+            words.extend(rng.choice(frames[frame]).split())
+        else:
+            words.append(rng.choice(FILLER))
+    return " ".join(words[:n_words])
+
+def make_html(rng: random.Random, title: str, text: str) -> str:
+    words = text.split()
+    paras, i = [], 0
+    while i < len(words):
+        step = rng.randint(40, 90)
+        paras.append("<p>" + escape(" ".join(words[i:i+step])) + "</p>")
+        i += step
+    nav = "".join(f'<li><a href="/section/{k}">Section {k}</a></li>' for k in range(12))
+    return (
+        "<!doctype html><html><head>"
+        f"<title>{escape(title)}</title>"
+        "<style>body{font-family:serif}</style>"
+        "<script>window.dataLayer=window.dataLayer||[];function gtag(){dataLayer.push(arguments)}</script>"
+        "</head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f'<main><article class="article-body"><h1>{escape(title)}</h1>{"".join(paras)}</article>'
+        '<aside class="related"><a href="/related/1">Related story</a></aside></main>'
+        "<footer><form><input name=\"email\"></form>Copyright</footer>"
+        "</body></html>"
+    )
+
+def iter_docs(cfg: SynthConfig, frames: Dict[str, List[str]]) -> Iterator[dict]:
+    """Deterministic stream of documents, spread over poles and actors."""
+    rng = random.Random(cfg.seed)
+    for i in range(cfg.n_docs):
+        pole = POLES[i % len(POLES)]
+        actor = f"Synth Actor {(i // len(POLES)) % cfg.n_actors}"
+        n = rng.randint(10, 60) if rng.random() < cfg.short_rate else doc_length(rng, cfg)
+        yield {
+            "pole": pole,
+            "actor": actor,
+            "url": f"https://synthetic.example/{pole}/{i}",
+            "text": make_text(rng, frames, n, cfg.keyword_rate),
+        }
+
+def actor_file(actor: str) -> str:
+    return actor.replace(" ", "_").replace("/", "_") + ".jsonl"
+
+def write_raw_corpus(root: str|Path, cfg: SynthConfig, frames: Dict[str, List[str]]) -> int:
+    """Write data/raw/<pole>/<actor>.jsonl rows in the 01_collect schema."""
+    rng = random.Random(cfg.seed + 1)
+    buckets: Dict[tuple, List[dict]] = {}
+    for d in iter_docs(cfg, frames):
+        seed = f"https://synthetic.example/{d['pole']}/feed"
+        rows = buckets.setdefault((d["pole"], d["actor"]), [])
+        if not rows:
+            rows.append({
+                "actor": d["actor"], "type": "media", "seed": seed, "url": seed,
+                "rss_links": 0, "mode": "rss",
+            })
+        wc = len(d["text"].split())
+        row = {
+            "url": d["url"],
+            "text": d["text"],
+            "word_count": wc,
+            "too_short": wc < 80,
+            "snippet": d["text"][:240],
+            "actor": d["actor"],
+            "type": "media",
+            "seed": seed,
+        }
+        rows.append(row)
+        if rng.random() < cfg.dup_rate:
+            rows.append(dict(row))
+
+    n = 0
+    for (pole, actor), rows in buckets.items():
+        pole_dir = Path(root) / "data" / "raw" / pole
+        pole_dir.mkdir(parents=True, exist_ok=True)
+        with (pole_dir / actor_file(actor)).open("wb") as f:
+            for r in rows:
+                f.write(orjson.dumps(r) + b"\n")
+        n += len(rows)
+    return n
+
+def make_sequences(cfg: SynthConfig, states: List[str], window_tokens: int = 220) -> List[List[str]]:
+    """Sticky random walks over states, one per doc, sized like to_state_sequence output."""
+    rng = random.Random(cfg.seed + 2)
+    out: List[List[str]] = []
+    for _ in range(cfg.n_docs):
+        n = max(2, doc_length(rng, cfg) // window_tokens)
+        s = rng.choice(states)
+        seq = [s]
+        for _ in range(n - 1):
+            if rng.random() > 0.35:
+                s = rng.choice(states)
+            seq.append(s)
+        out.append(seq)
+    return out
+
+def write_features(root: str|Path, cfg: SynthConfig, states: List[str]) -> int:
+    """Write data/features/<pole>/<actor>.jsonl rows in the 03_extract_frames schema."""
+    seqs = make_sequences(cfg, states)
+    files: Dict[Path, List[bytes]] = {}
+    for i, seq in enumerate(seqs):
+        pole = POLES[i % len(POLES)]
+        actor = f"Synth Actor {(i // len(POLES)) % cfg.n_actors}"
+        fp = Path(root) / "data" / "features" / pole / actor_file(actor)
+        files.setdefault(fp, []).append(orjson.dumps({
+            "actor": actor,
+            "type": "media",
+            "url": f"https://synthetic.example/{pole}/{i}",
+            "seed": f"https://synthetic.example/{pole}/feed",
+            "states": seq,
+            "n_states": len(seq),
+        }))
+    for fp, lines in files.items():
+        fp.parent.mkdir(parents=True, exist_ok=True)
+        fp.write_bytes(b"\n".join(lines) + b"\n")
+    return len(seqs)
+
+def make_rss(base_url: str, n_items: int) -> str:
+    items = "".join(
+        f"<item><title>Story {i}</title><link>{base_url}/article/{i}</link>"
+        f'<guid isPermaLink="true">{base_url}/article/{i}</guid></item>'
+        for i in range(n_items)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f"<rss version=\"2.0\"><channel><title>Synthetic</title><link>{base_url}/</link>{items}</channel></rss>"
+    )
+
+class SynthServer:
+    """Local stand-in for a news site: /feed (RSS) and /article/<i> (HTML)."""
+
+    def __init__(self, cfg: SynthConfig, frames: Dict[str, List[str]], host: str = "127.0.0.1"):
+        self.cfg = cfg
+        self.pages: List[bytes] = []
+        rng = random.Random(cfg.seed + 3)
+        for i, d in enumerate(iter_docs(cfg, frames)):
+            self.pages.append(make_html(rng, f"Story {i}", d["text"]).encode("utf-8"))
+
+        pages = self.pages
+        rss: Dict[str, bytes] = {}
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                status = 200
+                if path == "/feed":
+                    body, ctype = rss["feed"], "application/rss+xml"
+                elif path.startswith("/article/") and path[9:].isdigit() and int(path[9:]) < len(pages):
+                    body, ctype = pages[int(path[9:])], "text/html; charset=utf-8"
+                else:
+                    status, body, ctype = 404, b"not found", "text/plain"
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        rss["feed"] = make_rss(self.base_url, len(pages)).encode("utf-8")
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def feed_url(self) -> str:
+        return f"{self.base_url}/feed"
+
+    def __enter__(self) -> "SynthServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -6,7 +6,8 @@ import xml.etree.ElementTree as ET
 import httpx
 import yaml, orjson
 
-from src.http_client import HttpClient, FetchConfig
+from src import metrics
+from src.http_client import HttpClient, FetchConfig, host_of
 from src.text_utils import extract_links, extract_visible_text
 
 RSS_LINK_LIMIT = 80
@@ -86,8 +87,17 @@ def fetch_rss_sync(url: str) -> str:
         "Accept": "application/rss+xml, application/atom+xml, application/xml;q=0.9, text/xml;q=0.8, */*;q=0.5",
         "Accept-Language": "en-US,en;q=0.9",
     }
+    host = host_of(url)
     with httpx.Client(headers=headers, follow_redirects=True, timeout=20) as c:
-        r = c.get(url)
+        try:
+            with metrics.timer("http_fetch_seconds", host=host):
+                r = c.get(url)
+        except Exception as e:
+            metrics.inc("http_errors_total", host=host, error=e.__class__.__name__)
+            raise
+        metrics.inc("http_responses_total", host=host, status=r.status_code)
+        metrics.inc("http_bytes_downloaded_total", r.num_bytes_downloaded, host=host)
+        metrics.inc("http_body_bytes_total", len(r.content), host=host)
         r.raise_for_status()
         return r.text
 
@@ -112,6 +122,7 @@ async def fetch_pages(client: HttpClient, urls: list[str], limit: int) -> list[d
                 html = await client.get_text(url)
                 text = extract_visible_text(html)
                 wc = len(text.split())
+                metrics.inc("pages_total", outcome="too_short" if wc < MIN_WORDS else "ok")
                 return {
                     "url": url,
                     "text": text,
@@ -120,6 +131,7 @@ async def fetch_pages(client: HttpClient, urls: list[str], limit: int) -> list[d
                     "snippet": text[:240]
                 }
             except Exception as e:
+                metrics.inc("pages_total", outcome="error")
                 return {"url": url, "error": repr(e), "text": "", "word_count": 0, "too_short": True}
 
     tasks = [_one(u) for u in out]
@@ -155,7 +167,8 @@ async def main():
                         ok_any = True
 
                         if looks_like_rss(seed_url):
-                            links = parse_rss_links(raw, limit=RSS_LINK_LIMIT)
+                            with metrics.timer("xml_parse_seconds"):
+                                links = parse_rss_links(raw, limit=RSS_LINK_LIMIT)
                             rss_links_n += len(links)
 
                             all_rows.append({
@@ -205,9 +218,10 @@ async def main():
                         print(f"[WARN] {pole}/{actor['name']} seed failed: {seed_url} -> {e.__class__.__name__}")
 
                 out_fp = pole_dir / f"{name}.jsonl"
-                with out_fp.open("wb") as f:
-                    for r in all_rows:
-                        f.write(orjson.dumps(r) + b"\n")
+                with metrics.timer("json_seconds", op="encode"):
+                    payload = b"".join(orjson.dumps(r) + b"\n" for r in all_rows)
+                out_fp.write_bytes(payload)
+                metrics.inc("docs_written_total", len(all_rows))
 
                 useful = sum(
                     1 for r in all_rows
@@ -225,4 +239,5 @@ async def main():
         await client.aclose()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    with metrics.stage("01_collect"):
+        asyncio.run(main())
@@ -2,6 +2,8 @@ from __future__ import annotations
 from pathlib import Path
 import hashlib, orjson
 
+from src import metrics
+
 def ensure_dir(p: str|Path) -> Path:
     p = Path(p); p.mkdir(parents=True, exist_ok=True); return p
 
@@ -19,21 +21,33 @@ def run():
         out_pole = ensure_dir(out / pole)
         for fp in (raw / pole).glob("*.jsonl"):
             rows_out = []
-            for line in fp.read_bytes().splitlines():
-                r = orjson.loads(line)
+            short = dups = 0
+            data = fp.read_bytes()
+            # metrics are per file: per-record timers cost as much as orjson itself
+            with metrics.timer("json_seconds", op="decode"):
+                rows = [orjson.loads(line) for line in data.splitlines()]
+            for r in rows:
                 text = (r.get("text") or "").strip()
                 if len(text.split()) < 80:
+                    short += 1
                     continue
                 key = fid(r.get("url",""), text)
                 if key in seen:
+                    dups += 1
                     continue
                 seen.add(key)
                 r["text"] = text[:200000]
                 rows_out.append(r)
+            with metrics.timer("json_seconds", op="encode"):
+                payload = b"".join(orjson.dumps(r) + b"\n" for r in rows_out)
             out_fp = out_pole / fp.name
-            with out_fp.open("wb") as f:
-                for r in rows_out:
-                    f.write(orjson.dumps(r) + b"\n")
+            out_fp.write_bytes(payload)
+            metrics.inc("bytes_read_total", len(data))
+            metrics.inc("docs_read_total", len(rows))
+            metrics.inc("docs_dropped_total", short, reason="too_short")
+            metrics.inc("docs_dropped_total", dups, reason="duplicate")
+            metrics.inc("docs_written_total", len(rows_out))
             print(f"[OK] {pole} {fp.name}: {len(rows_out)}")
 if __name__ == "__main__":
-    run()
+    with metrics.stage("02_clean_dedupe"):
+        run()
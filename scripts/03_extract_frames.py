@@ -1,7 +1,11 @@
 from __future__ import annotations
 from pathlib import Path
+import shutil
 import yaml, orjson
-from src.frame_model import FrameModel
+from src import metrics
+from src.frame_model import BASE, FrameModel, lexicon_hash, load_variants
+
+SWEEP_DIR = Path("data/features_sweep")
 
 def load_yaml(p: str|Path) -> dict:
     return yaml.safe_load(Path(p).read_text(encoding="utf-8")) or {}
@@ -11,30 +15,56 @@ def ensure_dir(p: str|Path) -> Path:
 
 def run():
     frames_cfg = load_yaml("config/frames.yaml")
-    model = FrameModel(frame_lexicon=frames_cfg["frames"])
+    variants = load_variants(frames_cfg["frames"])
+    model = FrameModel(frame_lexicon=frames_cfg["frames"], variants=variants)
     clean = Path("data/clean")
     out = ensure_dir("data/features")
+    # every variant is scored in the same pass as frames.yaml; never leave rows from an older config
+    shutil.rmtree(SWEEP_DIR, ignore_errors=True)
+    sweep = ensure_dir(SWEEP_DIR) if variants else None
 
     for pole in ["conservative","liberal"]:
         out_pole = ensure_dir(out / pole)
         for fp in (clean / pole).glob("*.jsonl"):
-            out_fp = out_pole / fp.name
-            n = 0
-            with out_fp.open("wb") as f:
-                for line in fp.read_bytes().splitlines():
-                    r = orjson.loads(line)
-                    seq = model.to_state_sequence(r.get("text",""))
-                    if len(seq) < 2:
-                        continue
-                    f.write(orjson.dumps({
-                        "actor": r.get("actor",""),
-                        "type": r.get("type",""),
-                        "url": r.get("url",""),
-                        "seed": r.get("seed",""),
-                        "states": seq,
-                        "n_states": len(seq)
-                    }) + b"\n")
-                    n += 1
+            data = fp.read_bytes()
+            with metrics.timer("json_seconds", op="decode"):
+                rows = [orjson.loads(line) for line in data.splitlines()]
+
+            rows_out, sweep_out = [], []
+            for r in rows:
+                seqs = model.to_state_sequences(r.get("text",""))
+                seq = seqs[BASE]
+                meta = {
+                    "actor": r.get("actor",""),
+                    "type": r.get("type",""),
+                    "url": r.get("url",""),
+                    "seed": r.get("seed",""),
+                }
+                # sweep rows keep every doc (even empty sequences) so stage 04 can compute yield
+                if sweep:
+                    sweep_out.append({**meta, "states": seqs})
+                if len(seq) < 2:
+                    continue
+                rows_out.append({**meta, "states": seq, "n_states": len(seq)})
+
+            with metrics.timer("json_seconds", op="encode"):
+                payload = b"".join(orjson.dumps(r) + b"\n" for r in rows_out)
+                sweep_payload = b"".join(orjson.dumps(r) + b"\n" for r in sweep_out)
+            (out_pole / fp.name).write_bytes(payload)
+            if sweep:
+                (ensure_dir(sweep / pole) / fp.name).write_bytes(sweep_payload)
+
+            n = len(rows_out)
+            metrics.inc("bytes_read_total", len(data))
+            metrics.inc("docs_read_total", len(rows))
+            metrics.inc("docs_dropped_total", len(rows) - n, reason="short_sequence")
+            metrics.inc("docs_written_total", n)
             print(f"[OK] {pole} {fp.name}: {n} sequences")
+    if variants:
+        # written last, so stage 04 only trusts a completed pass
+        manifest = {"variants": {name: lexicon_hash(lex) for name, lex in model.lexicons.items()}}
+        (sweep / "manifest.json").write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+        print(f"[OK] lexicon sweep: {len(variants)} variants -> {sweep}")
 if __name__ == "__main__":
-    run()
+    with metrics.stage("03_extract_frames"):
+        run()
@@ -2,9 +2,12 @@ from __future__ import annotations
 from pathlib import Path
 import yaml, orjson
 import numpy as np
+from src import metrics
+from src.frame_model import BASE, lexicon_hash, load_variants
 from src.markov import build_markov, entropy_rows, loop_strength, kl_divergence
 
 MIN_ACTOR_SEQS = 3  # umbral para guardar Markov por actor (evita ruido)
+SWEEP_DIR = Path("data/features_sweep")
 
 def load_yaml(p: str|Path) -> dict:
     return yaml.safe_load(Path(p).read_text(encoding="utf-8")) or {}
@@ -12,9 +15,32 @@ def load_yaml(p: str|Path) -> dict:
 def ensure_dir(p: str|Path) -> Path:
     p = Path(p); p.mkdir(parents=True, exist_ok=True); return p
 
-def read_rows(fp: Path):
-    for line in fp.read_bytes().splitlines():
-        yield orjson.loads(line)
+def read_rows(fp: Path, source: str) -> list[dict]:
+    data = fp.read_bytes()
+    with metrics.timer("json_seconds", op="decode"):
+        rows = [orjson.loads(line) for line in data.splitlines()]
+    metrics.inc("bytes_read_total", len(data), source=source)
+    metrics.inc("docs_read_total", len(rows), source=source)
+    return rows
+
+def pole_summary(seqs: list[list[str]], states: list[str]):
+    mr = build_markov(seqs, states)
+    return mr, {
+        "states": states,
+        "counts": mr.counts.tolist(),
+        "P": mr.P.tolist(),
+        "entropy": entropy_rows(mr.P).tolist(),
+        "loop_strength": loop_strength(mr.P).tolist(),
+        "n_sequences": len(seqs),
+    }
+
+def divergence(cons, lib) -> dict:
+    P = np.array(cons.P)
+    Q = np.array(lib.P)
+    return {
+        "KL_conservative||liberal": kl_divergence(P, Q),
+        "KL_liberal||conservative": kl_divergence(Q, P),
+    }
 
 def safe_key(s: str) -> str:
     return (
@@ -36,32 +62,20 @@ def run():
     results: dict = {}
     pole_models = {}
 
+    # each features file is read once and shared by the pole and actor aggregations
+    rows_by_pole = {
+        pole: [r for fp in (feats / pole).glob("*.jsonl") for r in read_rows(fp, "features")]
+        for pole in ["conservative","liberal"]
+    }
+
     # ---- Pole-level Markov
     for pole in ["conservative","liberal"]:
-        all_seqs = []
-        for fp in (feats / pole).glob("*.jsonl"):
-            for r in read_rows(fp):
-                all_seqs.append(r["states"])
-
-        mr = build_markov(all_seqs, states)
-        pole_models[pole] = mr
-
-        results[pole] = {
-            "states": states,
-            "counts": mr.counts.tolist(),
-            "P": mr.P.tolist(),
-            "entropy": entropy_rows(mr.P).tolist(),
-            "loop_strength": loop_strength(mr.P).tolist(),
-            "n_sequences": len(all_seqs),
-        }
+        all_seqs = [r["states"] for r in rows_by_pole[pole]]
+
+        pole_models[pole], results[pole] = pole_summary(all_seqs, states)
         print(f"[OK] pole {pole}: sequences={len(all_seqs)}")
 
-    P = np.array(pole_models["conservative"].P)
-    Q = np.array(pole_models["liberal"].P)
-    results["divergence"] = {
-        "KL_conservative||liberal": kl_divergence(P, Q),
-        "KL_liberal||conservative": kl_divergence(Q, P),
-    }
+    results["divergence"] = divergence(pole_models["conservative"], pole_models["liberal"])
 
     # ---- Actor-level Markov (NEW)
     actors_out = {}
@@ -69,10 +83,9 @@ def run():
 
     for pole in ["conservative","liberal"]:
         buckets: dict[str, list[list[str]]] = {}
-        for fp in (feats / pole).glob("*.jsonl"):
-            for r in read_rows(fp):
-                actor = r.get("actor","").strip() or "Unknown"
-                buckets.setdefault(actor, []).append(r["states"])
+        for r in rows_by_pole[pole]:
+            actor = r.get("actor","").strip() or "Unknown"
+            buckets.setdefault(actor, []).append(r["states"])
 
         for actor, seqs in buckets.items():
             n = len(seqs)
@@ -113,9 +126,79 @@ def run():
     )
 
     out_fp = out_dir / "markov_results.json"
-    out_fp.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+    with metrics.timer("json_seconds", op="encode"):
+        out_fp.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
     print(f"[OK] wrote {out_fp}")
     print(f"[OK] actor matrices saved: {len(actors_out)} (min_seqs={MIN_ACTOR_SEQS})")
 
+    variants = load_variants(frames_cfg["frames"])
+    if variants:
+        run_sweep(frames_cfg["frames"], variants, out_dir)
+    else:
+        # no sweep configured: drop results from an earlier one so 05 doesn't report them
+        (out_dir / "sweep_results.json").unlink(missing_ok=True)
+
+def check_sweep_manifest(variants: dict):
+    manifest_fp = SWEEP_DIR / "manifest.json"
+    if not manifest_fp.exists():
+        raise SystemExit(f"[ERR] missing: {manifest_fp} (re-run scripts/03_extract_frames.py)")
+    done = orjson.loads(manifest_fp.read_bytes()).get("variants", {})
+    stale = [name for name, lex in variants.items() if done.get(name) != lexicon_hash(lex)]
+    if stale:
+        raise SystemExit(f"[ERR] lexicons missing or changed since stage 03: {stale} (re-run scripts/03_extract_frames.py)")
+
+def run_sweep(frames: dict, variants: dict, out_dir: Path):
+    """Pole-level Markov per lexicon variant, from the single-pass output of stage 03."""
+    variants = {BASE: frames, **variants}
+    check_sweep_manifest(variants)
+
+    seqs = {name: {"conservative": [], "liberal": []} for name in variants}
+    n_docs = {"conservative": 0, "liberal": 0}
+    for pole in ["conservative","liberal"]:
+        for fp in (SWEEP_DIR / pole).glob("*.jsonl"):
+            for r in read_rows(fp, "features_sweep"):
+                n_docs[pole] += 1
+                for name, seq in r["states"].items():
+                    if name in seqs and len(seq) >= 2:
+                        seqs[name][pole].append(seq)
+
+    if not any(n_docs.values()):
+        (out_dir / "sweep_results.json").unlink(missing_ok=True)
+        print(f"[WARN] lexicon sweep skipped: no rows in {SWEEP_DIR}")
+        return
+
+    out: dict = {}
+    table = []
+    for name, lex in variants.items():
+        states = list(lex.keys())
+        res: dict = {"states": states}
+        models = {}
+        for pole in ["conservative","liberal"]:
+            models[pole], res[pole] = pole_summary(seqs[name][pole], states)
+            res[pole]["n_docs"] = n_docs[pole]
+            res[pole]["yield"] = len(seqs[name][pole]) / n_docs[pole] if n_docs[pole] else 0.0
+        res["divergence"] = divergence(models["conservative"], models["liberal"])
+        out[name] = res
+
+        table.append({
+            "variant": name,
+            "n_states": len(states),
+            **res["divergence"],
+            "mean_entropy_conservative": float(np.mean(res["conservative"]["entropy"])),
+            "mean_entropy_liberal": float(np.mean(res["liberal"]["entropy"])),
+            "yield_conservative": res["conservative"]["yield"],
+            "yield_liberal": res["liberal"]["yield"],
+        })
+        print(
+            f"[OK] variant {name}: KL(c||l)={res['divergence']['KL_conservative||liberal']:.4f} "
+            f"seqs={res['conservative']['n_sequences']}/{res['liberal']['n_sequences']}"
+        )
+
+    out_fp = out_dir / "sweep_results.json"
+    with metrics.timer("json_seconds", op="encode"):
+        out_fp.write_bytes(orjson.dumps({"variants": out, "comparison": table}, option=orjson.OPT_INDENT_2))
+    print(f"[OK] wrote {out_fp} ({len(variants)} lexicons)")
+
 if __name__ == "__main__":
-    run()
+    with metrics.stage("04_build_markov"):
+        run()
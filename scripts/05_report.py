@@ -3,6 +3,8 @@ from pathlib import Path
 import orjson
 import numpy as np
 
+from src import metrics
+
 def mean(x): return float(np.mean(np.array(x, dtype=float))) if x else 0.0
 
 def top_transitions(P, states, k=12):
@@ -15,7 +17,8 @@ def top_transitions(P, states, k=12):
     return pairs[:k]
 
 def run():
-    data = orjson.loads(Path("data/reports/markov/markov_results.json").read_bytes())
+    with metrics.timer("json_seconds", op="decode"):
+        data = orjson.loads(Path("data/reports/markov/markov_results.json").read_bytes())
     states = data["conservative"]["states"]
 
     lines = []
@@ -39,9 +42,25 @@ def run():
     for r in data.get("actor_stats", [])[:12]:
         lines.append(f"- [{r['pole']}] {r['actor']} | seqs={r['n_sequences']} | mean_entropy={r['mean_entropy']:.3f} | mean_loop={r['mean_loop']:.3f}\n")
 
+    sweep_fp = Path("data/reports/markov/sweep_results.json")
+    if sweep_fp.exists():
+        with metrics.timer("json_seconds", op="decode"):
+            sweep = orjson.loads(sweep_fp.read_bytes())
+        lines.append("\n## Lexicon sweep\n")
+        lines.append("| variant | states | KL(c‖l) | KL(l‖c) | H cons | H lib | yield cons | yield lib |\n")
+        lines.append("|---|---|---|---|---|---|---|---|\n")
+        for r in sweep.get("comparison", []):
+            lines.append(
+                f"| {r['variant']} | {r['n_states']} "
+                f"| {r['KL_conservative||liberal']:.4f} | {r['KL_liberal||conservative']:.4f} "
+                f"| {r['mean_entropy_conservative']:.3f} | {r['mean_entropy_liberal']:.3f} "
+                f"| {r['yield_conservative']:.3f} | {r['yield_liberal']:.3f} |\n"
+            )
+
     out_fp = Path("data/reports/report.md")
     out_fp.write_text("".join(lines), encoding="utf-8")
     print(f"[OK] wrote {out_fp}")
 
 if __name__ == "__main__":
-    run()
+    with metrics.stage("05_report"):
+        run()
@@ -1,8 +1,12 @@
 from __future__ import annotations
 from pathlib import Path
-import shutil
+import shutil, sys
 
 ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))  # CI runs this file directly, without PYTHONPATH
+
+from src import metrics
 SRC_JSON = ROOT / "data" / "reports" / "markov" / "markov_results.json"
 SRC_MD   = ROOT / "data" / "reports" / "report.md"
 
@@ -23,10 +27,12 @@ def main():
 
     shutil.copy2(SRC_JSON, DST_JSON)
     shutil.copy2(SRC_MD, DST_MD)
+    metrics.inc("bytes_copied_total", SRC_JSON.stat().st_size + SRC_MD.stat().st_size)
 
     print("[OK] docs/ rebuilt (copy-only)")
     print(f"     -> {DST_JSON}")
     print(f"     -> {DST_MD}")
 
 if __name__ == "__main__":
-    main()
+    with metrics.stage("06_build_site"):
+        main()
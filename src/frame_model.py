@@ -1,36 +1,118 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Dict, List
-import re
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import hashlib, re
+
+import yaml, orjson
+
+from src import metrics
+
+BASE = "base"
+TOKEN = re.compile(r"\w+")
+
+# Optional lexicon sweep, read by stages 03 and 04
+VARIANTS_CFG = Path("config/frame_variants.yaml")
+
+Lexicon = Dict[str, List[str]]
+
+def overlay_lexicon(base: Lexicon, overrides: Optional[Dict[str, Optional[List[str]]]]) -> Lexicon:
+    """Variant lexicon: listed frames replace the base keywords, frames set to None are dropped."""
+    out = {frame: list(kws) for frame, kws in base.items()}
+    for frame, kws in (overrides or {}).items():
+        if kws is None:
+            out.pop(frame, None)
+        else:
+            out[frame] = list(kws)
+    return out
+
+def load_variants(frames: Lexicon, path: str|Path = VARIANTS_CFG) -> Dict[str, Lexicon]:
+    path = Path(path)
+    if not path.exists():
+        return {}
+    variants = (yaml.safe_load(path.read_text(encoding="utf-8")) or {}).get("variants") or {}
+    return {name: overlay_lexicon(frames, over) for name, over in variants.items()}
+
+def lexicon_hash(lex: Lexicon) -> str:
+    # frame order matters: it fixes the state order and breaks score ties
+    return hashlib.sha1(orjson.dumps(list(lex.items()))).hexdigest()
 
 @dataclass
 class FrameModel:
-    frame_lexicon: Dict[str, List[str]]
+    frame_lexicon: Lexicon
+    variants: Dict[str, Lexicon] = field(default_factory=dict)
 
-    def score(self, text: str) -> Dict[str, float]:
-        t = text.lower()
-        scores: Dict[str, float] = {}
-        for frame, kws in self.frame_lexicon.items():
-            s = 0.0
-            for kw in kws:
-                kwl = kw.lower()
+    def __post_init__(self):
+        if BASE in self.variants:
+            raise ValueError(f"variant name {BASE!r} is reserved for frame_lexicon")
+        self.lexicons: Dict[str, Lexicon] = {BASE: self.frame_lexicon, **self.variants}
+        for name, lex in self.lexicons.items():
+            if not lex:
+                raise ValueError(f"lexicon {name!r} has no frames (every frame set to null?)")
+
+        # Union of keywords over every lexicon, so each window is matched once.
+        # Plain words are counted from one tokenization: for a keyword made only of
+        # \w chars, \bkw\b matches exactly the \w+ tokens equal to it.
+        # Keyword lists shared between lexicons are summed once per window.
+        self._groups: Dict[tuple, int] = {}
+        self._lex_groups: Dict[str, List[tuple]] = {}
+        for name, lex in self.lexicons.items():
+            self._lex_groups[name] = [
+                (frame, self._groups.setdefault(tuple(kw.lower() for kw in kws), len(self._groups)))
+                for frame, kws in lex.items()
+            ]
+        self._phrases: set = set()
+        self._patterns: Dict[str, re.Pattern] = {}
+        for group in self._groups:
+            for kwl in group:
                 if " " in kwl:
-                    s += 2.0 * t.count(kwl)
-                else:
-                    s += len(re.findall(rf"\b{re.escape(kwl)}\b", t))
-            scores[frame] = s
-        return scores
+                    self._phrases.add(kwl)
+                elif not TOKEN.fullmatch(kwl):
+                    self._patterns[kwl] = re.compile(rf"\b{re.escape(kwl)}\b")
+
+    def keyword_counts(self, text: str) -> Counter:
+        t = text.lower()
+        counts = Counter(TOKEN.findall(t))
+        for kwl in self._phrases:
+            counts[kwl] = 2 * t.count(kwl)  # phrases weigh double
+        for kwl, rx in self._patterns.items():
+            counts[kwl] = len(rx.findall(t))
+        return counts
+
+    def _group_scores(self, counts: Counter) -> List[float]:
+        return [float(sum(counts[kwl] for kwl in group)) for group in self._groups]
+
+    def _frame_scores(self, gs: List[float], name: str) -> Dict[str, float]:
+        return {frame: gs[g] for frame, g in self._lex_groups[name]}
+
+    def score(self, text: str) -> Dict[str, float]:
+        with metrics.timer("frame_score_seconds"):
+            return self._frame_scores(self._group_scores(self.keyword_counts(text)), BASE)
 
     def to_state_sequence(self, text: str, window_tokens: int = 220) -> List[str]:
+        return self.to_state_sequences(text, window_tokens, names=[BASE])[BASE]
+
+    def to_state_sequences(
+        self, text: str, window_tokens: int = 220, names: Optional[Iterable[str]] = None
+    ) -> Dict[str, List[str]]:
+        names = list(self.lexicons) if names is None else list(names)
+        seqs: Dict[str, List[str]] = {name: [] for name in names}
         words = text.split()
         if not words:
-            return []
-        seq: List[str] = []
+            return seqs
+        windows = 0
         for i in range(0, len(words), window_tokens):
             chunk = " ".join(words[i:i+window_tokens])
-            scores = self.score(chunk)
-            best = max(scores.items(), key=lambda x: x[1])
-            if best[1] <= 0:
-                continue
-            seq.append(best[0])
-        return seq
+            with metrics.timer("frame_score_seconds"):
+                gs = self._group_scores(self.keyword_counts(chunk))
+            windows += 1
+            for name in names:
+                best = max(self._frame_scores(gs, name).items(), key=lambda x: x[1])
+                if best[1] <= 0:
+                    continue
+                seqs[name].append(best[0])
+        metrics.inc("frame_windows_scored_total", windows)
+        for name in names:
+            metrics.inc("frame_windows_empty_total", windows - len(seqs[name]), lexicon=name)
+        return seqs
@@ -1,9 +1,13 @@
 from __future__ import annotations
 import asyncio
 from dataclasses import dataclass
+from urllib.parse import urlparse
+import time
 import httpx
 from tenacity import retry, stop_after_attempt, wait_exponential_jitter
 
+from src import metrics
+
 @dataclass
 class FetchConfig:
     timeout_s: float = 25.0
@@ -16,6 +20,15 @@ class FetchConfig:
         "Chrome/122.0.0.0 Safari/537.36"
     )
 
+def host_of(url: str) -> str:
+    return urlparse(url).hostname or ""
+
+def _count_retry(retry_state) -> None:
+    # tenacity before_sleep hook: args are (self, url)
+    url = retry_state.args[1] if len(retry_state.args) > 1 else ""
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    metrics.inc("http_retries_total", host=host_of(url), error=exc.__class__.__name__ if exc else "")
+
 class RateLimiter:
     def __init__(self, rps: float):
         self.min_interval = 1.0 / max(0.1, rps)
@@ -59,9 +72,22 @@ class HttpClient:
     async def aclose(self):
         await self.client.aclose()
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential_jitter(initial=1, max=10))
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential_jitter(initial=1, max=10), before_sleep=_count_retry)
     async def get_text(self, url: str) -> str:
-        await self.limiter.wait()
-        r = await self.client.get(url)
+        host = host_of(url)
+        with metrics.timer("http_ratelimit_wait_seconds"):
+            await self.limiter.wait()
+        t0 = time.perf_counter()
+        try:
+            r = await self.client.get(url)
+        except Exception as e:
+            metrics.inc("http_errors_total", host=host, error=e.__class__.__name__)
+            raise
+        finally:
+            metrics.observe("http_fetch_seconds", time.perf_counter() - t0, host=host)
+        metrics.inc("http_responses_total", host=host, status=r.status_code)
+        # wire bytes (before decompression) vs decoded body size
+        metrics.inc("http_bytes_downloaded_total", r.num_bytes_downloaded, host=host)
+        metrics.inc("http_body_bytes_total", len(r.content), host=host)
         r.raise_for_status()
         return r.text
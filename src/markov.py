@@ -3,6 +3,8 @@ from dataclasses import dataclass
 from typing import List
 import numpy as np
 
+from src import metrics
+
 @dataclass
 class MarkovResult:
     states: List[str]
@@ -13,10 +15,16 @@ def build_markov(seqs: List[List[str]], states: List[str]) -> MarkovResult:
     idx = {s:i for i,s in enumerate(states)}
     n = len(states)
     counts = np.zeros((n,n), dtype=np.int64)
+    dropped = 0
     for seq in seqs:
         for a, b in zip(seq, seq[1:]):
             if a in idx and b in idx:
                 counts[idx[a], idx[b]] += 1
+            else:
+                dropped += 1
+    metrics.inc("markov_sequences_total", len(seqs))
+    metrics.inc("markov_transitions_total", int(counts.sum()))
+    metrics.inc("markov_transitions_dropped_total", dropped)
     sm = counts + 1
     P = sm / sm.sum(axis=1, keepdims=True)
     return MarkovResult(states=states, counts=counts, P=P)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+from bisect import bisect_left
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+import cProfile, io, os, pstats, threading, time, tracemalloc
+
+import orjson
+
+# Env flags:
+#   POLAR_METRICS_DIR     where <stage>.json / <stage>.prom are written (default data/metrics)
+#   POLAR_PROFILE         "cprofile" or "tracemalloc" to wrap the stage and dump a profile
+#   POLAR_PROFILE_STAGES  optional comma-separated stage names to restrict profiling to
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _num(v: float) -> str:
+    # lossless: integral values as ints, others with full float precision
+    v = float(v)
+    if v != v:
+        return "NaN"
+    if v in (float("inf"), float("-inf")):
+        return "+Inf" if v > 0 else "-Inf"
+    if v.is_integer() and abs(v) < 2**53:
+        return str(int(v))
+    return repr(v)
+
+def _labels(kw: dict) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in kw.items()))
+
+@dataclass
+class Histogram:
+    buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    counts: List[int] = field(default_factory=list)
+    total: float = 0.0
+    n: int = 0
+
+    def __post_init__(self):
+        if not self.counts:
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect_left(self.buckets, v)] += 1
+        self.total += v
+        self.n += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        out, acc = [], 0
+        for le, c in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            acc += c
+            out.append((le, acc))
+        return out
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        k = (name, _labels(labels))
+        with self.lock:
+            self.counters[k] = self.counters.get(k, 0.0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        with self.lock:
+            self.gauges[(name, _labels(labels))] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        k = (name, _labels(labels))
+        with self.lock:
+            h = self.histograms.get(k)
+            if h is None:
+                h = self.histograms[k] = Histogram()
+            h.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "counters": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self.counters.items())],
+                "gauges": [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self.gauges.items())],
+                "histograms": [
+                    {"name": n, "labels": dict(l), "count": h.n, "sum": h.total, "buckets": dict(h.cumulative())}
+                    for (n, l), h in sorted(self.histograms.items())
+                ],
+            }
+
+    def to_prometheus(self, prefix: str = "polar_") -> str:
+        def fmt(labels: Labels, extra: Labels = ()) -> str:
+            items = [*labels, *extra]
+            if not items:
+                return ""
+            esc = lambda s: s.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+        lines: List[str] = []
+        with self.lock:
+            for kind, series in (("counter", self.counters), ("gauge", self.gauges)):
+                seen = set()
+                for (n, l), v in sorted(series.items()):
+                    if n not in seen:
+                        lines.append(f"# TYPE {prefix}{n} {kind}")
+                        seen.add(n)
+                    lines.append(f"{prefix}{n}{fmt(l)} {_num(v)}")
+            seen = set()
+            for (n, l), h in sorted(self.histograms.items()):
+                if n not in seen:
+                    lines.append(f"# TYPE {prefix}{n} histogram")
+                    seen.add(n)
+                for le, c in h.cumulative():
+                    lines.append(f"{prefix}{n}_bucket{fmt(l, (('le', le),))} {c}")
+                lines.append(f"{prefix}{n}_sum{fmt(l)} {_num(h.total)}")
+                lines.append(f"{prefix}{n}_count{fmt(l)} {h.n}")
+        return "\n".join(lines) + "\n"
+
+METRICS = Metrics()
+
+inc = METRICS.inc
+observe = METRICS.observe
+timer = METRICS.timer
+
+def _profile_mode(name: str) -> str:
+    mode = os.environ.get("POLAR_PROFILE", "").strip().lower()
+    only = [s.strip() for s in os.environ.get("POLAR_PROFILE_STAGES", "").split(",") if s.strip()]
+    if only and name not in only:
+        return ""
+    if mode and mode not in ("cprofile", "tracemalloc"):
+        raise ValueError(f"POLAR_PROFILE must be 'cprofile' or 'tracemalloc', got {mode!r}")
+    return mode
+
+@contextmanager
+def stage(name: str) -> Iterator[Metrics]:
+    """Run a pipeline stage with fresh metrics; write <name>.json/.prom (and any profile) on exit."""
+    out_dir = Path(os.environ.get("POLAR_METRICS_DIR", "data/metrics"))
+    mode = _profile_mode(name)
+    METRICS.reset()
+    started = time.time()
+
+    prof = cProfile.Profile() if mode == "cprofile" else None
+    if mode == "tracemalloc":
+        tracemalloc.start(25)
+    if prof:
+        prof.enable()
+    t0 = time.perf_counter()
+    try:
+        yield METRICS
+    finally:
+        elapsed = time.perf_counter() - t0
+        if prof:
+            prof.disable()
+        METRICS.set("stage_seconds", elapsed)
+
+        out_dir.mkdir(parents=True, exist_ok=True)
+        if prof:
+            prof.dump_stats(str(out_dir / f"{name}.prof"))
+            s = io.StringIO()
+            pstats.Stats(prof, stream=s).sort_stats("cumulative").print_stats(40)
+            (out_dir / f"{name}.prof.txt").write_text(s.getvalue(), encoding="utf-8")
+        if mode == "tracemalloc":
+            snap = tracemalloc.take_snapshot()
+            METRICS.set("tracemalloc_peak_bytes", tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            top = snap.statistics("lineno")[:40]
+            (out_dir / f"{name}.tracemalloc.txt").write_text("\n".join(map(str, top)) + "\n", encoding="utf-8")
+
+        doc = {"stage": name, "started_at": started, "seconds": elapsed, "profile": mode or None, **METRICS.snapshot()}
+        (out_dir / f"{name}.json").write_bytes(orjson.dumps(doc, option=orjson.OPT_INDENT_2))
+        (out_dir / f"{name}.prom").write_text(METRICS.to_prometheus(), encoding="utf-8")
+        print(f"[OK] metrics -> {out_dir / name}.json ({elapsed:.2f}s{', profile=' + mode if mode else ''})")
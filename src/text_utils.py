@@ -3,6 +3,8 @@ import re
 from urllib.parse import urljoin, urlparse
 from selectolax.parser import HTMLParser
 
+from src import metrics
+
 WS = re.compile(r"\s+")
 
 def canonical_url(base: str, href: str) -> str | None:
@@ -18,13 +20,14 @@ def canonical_url(base: str, href: str) -> str | None:
     return p._replace(fragment="").geturl()
 
 def extract_links(base_url: str, html: str) -> list[str]:
-    tree = HTMLParser(html)
     out = []
-    for a in tree.css("a"):
-        href = a.attributes.get("href")
-        u = canonical_url(base_url, href)
-        if u:
-            out.append(u)
+    with metrics.timer("html_parse_seconds", fn="extract_links"):
+        tree = HTMLParser(html)
+        for a in tree.css("a"):
+            href = a.attributes.get("href")
+            u = canonical_url(base_url, href)
+            if u:
+                out.append(u)
     return out
 
 def _node_text(node) -> str:
@@ -35,6 +38,11 @@ def _node_text(node) -> str:
     return WS.sub(" ", node.text(separator=" ")).strip()
 
 def extract_visible_text(html: str) -> str:
+    metrics.inc("html_chars_total", len(html))
+    with metrics.timer("html_parse_seconds", fn="extract_visible_text"):
+        return _extract_visible_text(html)
+
+def _extract_visible_text(html: str) -> str:
     tree = HTMLParser(html)
 
     # Prefer main article containers